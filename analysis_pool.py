@@ -0,0 +1,130 @@
+import asyncio
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from analyzer import AviatorAnalyzer, analyze_room
+
+
+class AnalysisPool:
+    """Run analyzer work off the event loop: file I/O on threads, analysis on processes"""
+
+    def __init__(self, analyzer, io_workers=2, cpu_workers=None, use_processes=True):
+        self.analyzer = analyzer
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='analysis-io')
+        if use_processes:
+            self.cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers)
+        else:
+            self.cpu_pool = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix='analysis-cpu')
+
+    async def get_prediction(self, room_name):
+        """Async equivalent of AviatorAnalyzer.get_prediction"""
+        loop = asyncio.get_running_loop()
+        try:
+            # Recording a round is cheap and mutates shared state, so it stays on the loop
+            self.analyzer.record_round(room_name)
+            history = self.analyzer.room_histories[room_name]
+
+            save = loop.run_in_executor(
+                self.io_pool, self.analyzer.save_room_history, room_name, history[-500:]
+            )
+
+            recent = self.analyzer.recent_multipliers(room_name)
+            if recent is None:
+                prediction = self.analyzer.get_fallback_prediction(room_name)
+            else:
+                multipliers, total_history = recent
+                prediction = await loop.run_in_executor(
+                    self.cpu_pool, analyze_room, room_name, multipliers, total_history
+                )
+
+            await save
+            return prediction
+
+        except Exception as e:
+            print(f"Prediction error for {room_name}: {e}")
+            return self.analyzer.get_fallback_prediction(room_name)
+
+    async def get_predictions(self, room_names):
+        """Analyze several rooms concurrently"""
+        predictions = await asyncio.gather(*(self.get_prediction(room) for room in room_names))
+        return dict(zip(room_names, predictions))
+
+    def shutdown(self, wait=True):
+        self.io_pool.shutdown(wait=wait)
+        self.cpu_pool.shutdown(wait=wait)
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up from short sleeps"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return self.summary()
+
+    def summary(self):
+        """Lag statistics in milliseconds"""
+        if not self.samples:
+            return {'samples': 0, 'avg_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'samples': len(self.samples),
+            'avg_ms': round(sum(self.samples) / len(self.samples) * 1000, 2),
+            'max_ms': round(max(self.samples) * 1000, 2)
+        }
+
+
+async def compare_loop_lag(cycles=50, rooms=('room1', 'room2', 'room3'), pause=0.02):
+    """Measure event-loop lag for inline analysis versus the worker pool
+
+    Starts from empty histories and saves into a temporary directory, so the
+    synthetic rounds never touch the bot's real room files.
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        return await _compare_loop_lag(AviatorAnalyzer(load_data=False, data_dir=data_dir), cycles, rooms, pause)
+
+
+async def _compare_loop_lag(analyzer, cycles, rooms, pause):
+    monitor = LoopLagMonitor(interval=0.005)
+
+    monitor.start()
+    for _ in range(cycles):
+        for room_name in rooms:
+            analyzer.get_prediction(room_name)
+        await asyncio.sleep(pause)
+    inline = await monitor.stop()
+
+    pool = AnalysisPool(analyzer)
+    monitor.start()
+    for _ in range(cycles):
+        await pool.get_predictions(list(rooms))
+        await asyncio.sleep(pause)
+    pooled = await monitor.stop()
+    pool.shutdown()
+
+    return {'inline': inline, 'pooled': pooled}
+
+
+if __name__ == "__main__":
+    results = asyncio.run(compare_loop_lag())
+    print(f"Inline analysis loop lag: {results['inline']}")
+    print(f"Worker pool loop lag:     {results['pooled']}")
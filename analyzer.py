@@ -1,24 +1,39 @@
-import random
 from datetime import datetime
 import json
 import os
 import time
+from synthetic_feed import SyntheticFeed
+from snapshot import SnapshotReader, write_snapshot
 
 class AviatorAnalyzer:
-    def __init__(self):
+    def __init__(self, load_data=True, feed=None, data_dir='.'):
         self.room_histories = {
             'room1': [],
             'room2': [],
             'room3': []
         }
         self.targets = [1.5, 2, 3, 4, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 1000]
-        self.load_histories()
+        self.feed = feed or SyntheticFeed()
+        self.data_dir = data_dir
+        if load_data:
+            self.load_histories()
         self.prediction_cache = {}
     
     def load_histories(self):
-        """Load historical data for each room"""
+        """Load historical data for each room, preferring the binary snapshot"""
         for room in ['room1', 'room2', 'room3']:
-            filename = f"{room}_data.json"
+            snapshot_file = os.path.join(self.data_dir, f"{room}_data.avs")
+            filename = os.path.join(self.data_dir, f"{room}_data.json")
+            if os.path.exists(snapshot_file):
+                try:
+                    with SnapshotReader(snapshot_file) as reader:
+                        # Only the tail the analyzer keeps in memory is turned into records
+                        self.room_histories[room] = list(reader.records(-1000))
+                    print(f"Loaded {len(self.room_histories[room])} records for {room}")
+                    continue
+                except Exception as e:
+                    print(f"Snapshot load error for {room}, falling back to {filename}: {e}")
+            
             if os.path.exists(filename):
                 try:
                     with open(filename, 'r') as f:
@@ -32,15 +47,7 @@ class AviatorAnalyzer:
     def get_prediction(self, room_name):
         """Generate prediction for a specific room"""
         try:
-            # Simulate getting live data (replace with actual scraping)
-            live_data = self.simulate_live_data(room_name)
-            
-            # Add to history
-            self.room_histories[room_name].append(live_data)
-            
-            # Keep only last 1000 records
-            if len(self.room_histories[room_name]) > 1000:
-                self.room_histories[room_name] = self.room_histories[room_name][-1000:]
+            self.record_round(room_name)
             
             # Save to file
             self.save_room_history(room_name)
@@ -52,45 +59,54 @@ class AviatorAnalyzer:
             print(f"Prediction error for {room_name}: {e}")
             return self.get_fallback_prediction(room_name)
     
-    def simulate_live_data(self, room_name):
-        """Simulate live data from Betika (REPLACE WITH ACTUAL SCRAPING)"""
-        # Room-specific behavior
-        room_profiles = {
-            'room1': {'min': 1.0, 'max': 10.0, 'volatility': 0.5},
-            'room2': {'min': 1.0, 'max': 25.0, 'volatility': 1.0},
-            'room3': {'min': 1.0, 'max': 100.0, 'volatility': 2.0}
-        }
+    def record_round(self, room_name):
+        """Fetch the latest round and append it to the room history"""
+        # Simulate getting live data (replace with actual scraping)
+        live_data = self.simulate_live_data(room_name)
         
-        profile = room_profiles.get(room_name, {'min': 1.0, 'max': 5.0, 'volatility': 0.5})
+        # Add to history
+        self.room_histories[room_name].append(live_data)
         
-        # Generate multiplier with some randomness
-        base = random.uniform(profile['min'], profile['max'] / 2)
-        volatility = random.uniform(0, profile['volatility'])
-        multiplier = base * (1 + volatility)
+        # Keep only last 1000 records
+        if len(self.room_histories[room_name]) > 1000:
+            self.room_histories[room_name] = self.room_histories[room_name][-1000:]
         
-        # Occasionally generate very high multipliers
-        if random.random() < 0.05:  # 5% chance
-            multiplier = random.uniform(profile['max'] * 0.7, profile['max'] * 1.3)
+        return live_data
+    
+    def simulate_live_data(self, room_name):
+        """Simulate live data from Betika (REPLACE WITH ACTUAL SCRAPING)"""
+        multiplier = self.feed.generator(room_name).next_multiplier()
         
         return {
             'timestamp': datetime.now().isoformat(),
-            'multiplier': round(multiplier, 2),
+            'multiplier': multiplier,
             'room': room_name,
             'round_id': len(self.room_histories[room_name]) + 1
         }
     
     def analyze_patterns(self, room_name):
         """Analyze historical patterns for predictions"""
+        recent = self.recent_multipliers(room_name)
+        if recent is None:
+            return self.get_fallback_prediction(room_name)
+        
+        multipliers, total_history = recent
+        return self.analyze_multipliers(room_name, multipliers, total_history)
+    
+    def recent_multipliers(self, room_name):
+        """Select the multipliers to analyze, or None when there is too little history"""
         history = self.room_histories[room_name]
         
         if len(history) < 10:
-            return self.get_fallback_prediction(room_name)
+            return None
         
         # Get recent multipliers
         recent_count = min(30, len(history))
         recent = history[-recent_count:]
-        multipliers = [d['multiplier'] for d in recent]
-        
+        return [d['multiplier'] for d in recent], len(history)
+    
+    def analyze_multipliers(self, room_name, multipliers, total_history):
+        """Build a prediction from the recent multipliers of a room"""
         # Calculate statistics
         avg_multiplier = sum(multipliers) / len(multipliers)
         max_recent = max(multipliers)
@@ -100,7 +116,7 @@ class AviatorAnalyzer:
         trend = self.determine_trend(multipliers)
         
         # Calculate confidence
-        confidence = self.calculate_confidence(multipliers, len(history))
+        confidence = self.calculate_confidence(multipliers, total_history)
         
         # Generate prediction
         prediction = {
@@ -251,11 +267,17 @@ class AviatorAnalyzer:
         
         return prediction
     
-    def save_room_history(self, room_name):
-        """Save room history to file"""
-        filename = f"{room_name}_data.json"
+    def save_room_history(self, room_name, records=None):
+        """Save room history to a snapshot file"""
+        filename = os.path.join(self.data_dir, f"{room_name}_data.avs")
+        if records is None:
+            records = self.room_histories[room_name][-500:]
         try:
-            with open(filename, 'w') as f:
-                json.dump(self.room_histories[room_name][-500:], f, indent=2)
+            write_snapshot(filename, room_name, records)
         except Exception as e:
             print(f"Save error for {room_name}: {e}")
+
+
+def analyze_room(room_name, multipliers, total_history):
+    """Analyze a room in a worker process without loading any history files"""
+    return AviatorAnalyzer(load_data=False).analyze_multipliers(room_name, multipliers, total_history)
@@ -5,6 +5,8 @@ import logging
 import time
 import json
 import random
+import hashlib
+from poll_scheduler import RoomPollScheduler
 
 class BetikaScraper:
     def __init__(self):
@@ -21,6 +23,16 @@ class BetikaScraper:
             'room2': 'Red Room (5x-20x Focus)',
             'room3': 'Green Room (20x-1000x+ Focus)'
         }
+        self.scheduler = RoomPollScheduler(list(self.room_urls.keys()))
+        self.page_cache = {}  # room -> validators, body hash and last parsed data
+        self.poll_stats = {
+            'fetches': 0,
+            'not_modified': 0,
+            'parses': 0,
+            'parses_skipped': 0,
+            'failures': 0
+        }
+        self.poll_started = None  # Start of polling, for the fixed-interval baseline
         
     async def initialize(self):
         self.session = aiohttp.ClientSession()
@@ -60,6 +72,7 @@ class BetikaScraper:
     
     async def get_room_data(self, room_name):
         if not self.logged_in:
+            self.scheduler.record_failure(room_name)
             return None
             
         try:
@@ -70,74 +83,139 @@ class BetikaScraper:
                 'Referer': 'https://www.betika.com/en-ke/aviator'
             }
             
+            cached = self.page_cache.get(room_name)
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            if self.poll_started is None:
+                self.poll_started = time.time()
+            self.poll_stats['fetches'] += 1
             async with self.session.get(room_url, headers=headers) as response:
-                html = await response.text()
+                if response.status == 304 and cached:
+                    self.poll_stats['not_modified'] += 1
+                    return self._reuse_cached(room_name, cached)
                 
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            room_info = {
-                'room': room_name,
-                'room_display': self.room_names.get(room_name, room_name),
-                'timestamp': time.time(),
-                'multiplier': 1.0,
-                'players': random.randint(30, 300),
-                'total_bets': random.randint(1000, 50000),
-                'max_multiplier': random.uniform(5.0, 50.0)
-            }
+                if not 200 <= response.status < 300:
+                    # Error pages must not be parsed, hashed or cached as room pages
+                    logging.error(f"Room {room_name} returned HTTP {response.status}")
+                    self.poll_stats['failures'] += 1
+                    self.scheduler.record_failure(room_name)
+                    return None
+                
+                body = await response.read()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                
+            body_hash = hashlib.sha1(body).hexdigest()
+            if cached and cached['hash'] == body_hash:
+                self.poll_stats['parses_skipped'] += 1
+                cached['etag'] = etag or cached.get('etag')
+                cached['last_modified'] = last_modified or cached.get('last_modified')
+                return self._reuse_cached(room_name, cached)
             
-            multiplier_selectors = [
-                '.multiplier',
-                '.crash-value',
-                '.current-multiplier',
-                '[data-testid="multiplier"]',
-                '.game-multiplier',
-                '.multiplier-display',
-                '.betika-multiplier',
-                '.aviator-multiplier'
-            ]
+            self.poll_stats['parses'] += 1
+            room_info = self._parse_room_page(room_name, body.decode('utf-8', errors='replace'))
+            # The first fetch lands mid-round, so it only establishes the baseline signature
+            room_info['round_changed'] = cached is not None and self._round_signature(room_info) != self._round_signature(cached['data'])
             
-            for selector in multiplier_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    try:
-                        text = element.text.strip()
-                        if 'x' in text.lower():
-                            multiplier = float(text.replace('x', '').replace('X', '').strip())
-                            room_info['multiplier'] = multiplier
-                            break
-                        else:
-                            try:
-                                multiplier = float(text)
-                                room_info['multiplier'] = multiplier
-                                break
-                            except:
-                                continue
-                    except:
-                        continue
-            
-            history_selectors = ['.history-list', '.previous-rounds', '.round-history']
-            for selector in history_selectors:
-                history_elements = soup.select(selector + ' li')
-                if history_elements:
-                    history = []
-                    for elem in history_elements[-5:]:
-                        try:
-                            hist_text = elem.text.strip()
-                            if 'x' in hist_text:
-                                hist_mult = float(hist_text.replace('x', '').strip())
-                                history.append(hist_mult)
-                        except:
-                            continue
-                    if history:
-                        room_info['recent_history'] = history
+            self.page_cache[room_name] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'hash': body_hash,
+                'data': room_info
+            }
+            self.scheduler.record_poll(room_name, room_info['round_changed'])
             
             return room_info
                 
         except Exception as e:
             logging.error(f"Room {room_name} scraping error: {e}")
+            self.poll_stats['failures'] += 1
+            self.scheduler.record_failure(room_name)
             
         return None
     
+    def _parse_room_page(self, room_name, html):
+        """Extract the current multiplier and recent history from a room page"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        room_info = {
+            'room': room_name,
+            'room_display': self.room_names.get(room_name, room_name),
+            'timestamp': time.time(),
+            'multiplier': 1.0,
+            'players': random.randint(30, 300),
+            'total_bets': random.randint(1000, 50000),
+            'max_multiplier': random.uniform(5.0, 50.0)
+        }
+        
+        multiplier_selectors = [
+            '.multiplier',
+            '.crash-value',
+            '.current-multiplier',
+            '[data-testid="multiplier"]',
+            '.game-multiplier',
+            '.multiplier-display',
+            '.betika-multiplier',
+            '.aviator-multiplier'
+        ]
+        
+        for selector in multiplier_selectors:
+            element = soup.select_one(selector)
+            if element:
+                try:
+                    text = element.text.strip()
+                    if 'x' in text.lower():
+                        multiplier = float(text.replace('x', '').replace('X', '').strip())
+                        room_info['multiplier'] = multiplier
+                        break
+                    else:
+                        try:
+                            multiplier = float(text)
+                            room_info['multiplier'] = multiplier
+                            break
+                        except:
+                            continue
+                except:
+                    continue
+        
+        history_selectors = ['.history-list', '.previous-rounds', '.round-history']
+        for selector in history_selectors:
+            history_elements = soup.select(selector + ' li')
+            if history_elements:
+                history = []
+                for elem in history_elements[-5:]:
+                    try:
+                        hist_text = elem.text.strip()
+                        if 'x' in hist_text:
+                            hist_mult = float(hist_text.replace('x', '').strip())
+                            history.append(hist_mult)
+                    except:
+                        continue
+                if history:
+                    room_info['recent_history'] = history
+        
+        return room_info
+    
+    def _round_signature(self, room_info):
+        """Completed-round history, which only changes when a round finishes
+
+        The current multiplier is excluded because the selectors read the
+        in-flight value, which changes on every poll during a round.
+        """
+        return tuple(room_info.get('recent_history', []))
+    
+    def _reuse_cached(self, room_name, cached):
+        """Return the last parsed data for an unchanged page"""
+        room_info = dict(cached['data'])
+        room_info['timestamp'] = time.time()
+        room_info['round_changed'] = False
+        self.scheduler.record_poll(room_name, False)
+        return room_info
+    
     async def get_all_rooms_data(self):
         results = {}
         for room_name in ['room1', 'room2', 'room3']:
@@ -146,6 +224,35 @@ class BetikaScraper:
                 results[room_name] = data
         return results
     
+    async def poll_due_rooms(self):
+        """Fetch only the rooms whose next round end is near"""
+        results = {}
+        for room_name in self.scheduler.due_rooms():
+            data = await self.get_room_data(room_name)
+            if data:
+                results[room_name] = data
+        return results
+    
+    def seconds_until_next_poll(self):
+        """How long a polling loop can sleep before any room is due"""
+        return self.scheduler.seconds_until_next_poll()
+    
+    def get_poll_stats(self):
+        """Report fetches and parses avoided by scheduling and conditional requests
+
+        fetches_avoided compares actual fetches with polling every room at the
+        scheduler's default interval over the same elapsed time.
+        """
+        stats = dict(self.poll_stats)
+        elapsed = time.time() - self.poll_started if self.poll_started else 0.0
+        baseline = int(len(self.room_urls) * elapsed / self.scheduler.default_interval)
+        stats['baseline_fetches'] = baseline
+        stats['fetches_avoided'] = max(0, baseline - stats['fetches'])
+        stats['downloads_avoided'] = stats['not_modified']
+        stats['parses_avoided'] = stats['not_modified'] + stats['parses_skipped']
+        stats['cadence'] = {room: self.scheduler.get_cadence(room) for room in self.room_urls}
+        return stats
+    
     async def get_5x_specific_data(self, room_name):
         data = await self.get_room_data(room_name)
         if data:
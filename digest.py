@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from telegram_sender import PRIORITY_NORMAL
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+
+def telegram_length(text):
+    """Message length as Telegram counts it (UTF-16 code units)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+class DigestCoalescer:
+    """Merge the pending messages for each user into as few Telegram calls as possible"""
+
+    def __init__(self, limit=TELEGRAM_MESSAGE_LIMIT, separator=DIGEST_SEPARATOR):
+        self.limit = limit
+        self.separator = separator
+        self.pending = {}  # user_id -> list of (priority, message)
+        self.cycle_pending = {}  # Monitoring-cycle messages, only sent by flush_cycle
+        self.stats = {'queued': 0, 'sent': 0, 'saved': 0}
+        self._lock = asyncio.Lock()
+
+    def add(self, user_id, message, priority=PRIORITY_NORMAL):
+        """Queue a message for the next flush"""
+        self.pending.setdefault(user_id, []).append((priority, message))
+        self.stats['queued'] += 1
+
+    def add_to_cycle(self, user_id, message, priority=PRIORITY_NORMAL):
+        """Queue a message that must wait for the end of the current monitoring cycle"""
+        self.cycle_pending.setdefault(user_id, []).append((priority, message))
+        self.stats['queued'] += 1
+
+    def build_digests(self, messages):
+        """Pack (priority, message) pairs, most urgent first, into as few texts as fit
+
+        Each digest takes the priority of its most urgent part.
+        """
+        digests = []
+        current = ''
+        current_priority = None
+        for priority, message in sorted(messages, key=lambda item: item[0]):
+            if telegram_length(message) > self.limit:
+                message = self._truncate(message)
+            if not current:
+                current, current_priority = message, priority
+            elif telegram_length(current + self.separator + message) <= self.limit:
+                current = current + self.separator + message
+            else:
+                digests.append((current_priority, current))
+                current, current_priority = message, priority
+        if current:
+            digests.append((current_priority, current))
+        return digests
+
+    def _truncate(self, message):
+        suffix = '…'
+        while telegram_length(message + suffix) > self.limit:
+            message = message[:-64] if len(message) > 64 else message[:-1]
+        return message + suffix
+
+    async def flush(self, send):
+        """Send every user's pending messages as digests via send(user_id, text, priority)"""
+        async with self._lock:
+            pending, self.pending = self.pending, {}
+            await self._send_digests(pending, send)
+
+    async def flush_cycle(self, send):
+        """Send the finished cycle's messages together with anything else pending"""
+        async with self._lock:
+            pending, self.pending = self.pending, {}
+            for user_id, messages in self.cycle_pending.items():
+                pending.setdefault(user_id, []).extend(messages)
+            self.cycle_pending = {}
+            await self._send_digests(pending, send)
+
+    async def _send_digests(self, pending, send):
+        for user_id, messages in pending.items():
+            digests = self.build_digests(messages)
+            self.stats['sent'] += len(digests)
+            self.stats['saved'] += len(messages) - len(digests)
+            for priority, digest in digests:
+                try:
+                    await send(user_id, digest, priority)
+                except Exception as e:
+                    logger.error(f"Digest send error to {user_id}: {e}")
+
+    async def run(self, send, window=5.0):
+        """Flush on a fixed window so messages queued outside a monitoring cycle are not held back
+
+        Cycle messages are left alone so a user's alerts for one cycle always
+        go out together.
+        """
+        while True:
+            await asyncio.sleep(window)
+            await self.flush(send)
+
+    def get_stats(self):
+        """Report how many Telegram calls coalescing saved"""
+        return dict(self.stats)
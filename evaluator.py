@@ -0,0 +1,148 @@
+import json
+import os
+import time
+from collections import deque
+
+
+class TargetStats:
+    """Running accuracy counters for one room/target pair"""
+
+    __slots__ = ('count', 'hits', 'prob_sum', 'brier_sum', 'buckets')
+
+    def __init__(self, bucket_count):
+        self.count = 0
+        self.hits = 0
+        self.prob_sum = 0.0
+        self.brier_sum = 0.0
+        self.buckets = [[0, 0.0, 0] for _ in range(bucket_count)]  # [count, prob_sum, hits]
+
+    def update(self, probability, hit):
+        outcome = 1 if hit else 0
+        self.count += 1
+        self.hits += outcome
+        self.prob_sum += probability
+        self.brier_sum += (probability - outcome) ** 2
+
+        index = min(int(probability * len(self.buckets)), len(self.buckets) - 1)
+        bucket = self.buckets[index]
+        bucket[0] += 1
+        bucket[1] += probability
+        bucket[2] += outcome
+
+
+class OnlineEvaluator:
+    """Score emitted prob_{target}x values against the rounds that follow them
+
+    A prediction counts as a hit for a target if any of the next `horizon`
+    rounds in the same room reaches that target. Only unresolved predictions
+    are kept, so memory stays fixed per room and target.
+    """
+
+    def __init__(self, targets, horizon=1, buckets=10, snapshot_path=None, snapshot_interval=300):
+        if horizon < 1:
+            raise ValueError(f"horizon must be at least 1 round, got {horizon}")
+        self.targets = list(targets)
+        self.horizon = horizon
+        self.bucket_count = buckets
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.last_snapshot = time.time()
+        self.pending = {}  # room -> deque of [probabilities, rounds_left, max_multiplier]
+        self.stats = {}    # room -> {target: TargetStats}
+        self.evicted = {}  # room -> unresolved predictions dropped from a full backlog
+
+    def record_prediction(self, room_name, prediction):
+        """Start tracking a prediction until horizon rounds have been observed"""
+        if prediction.get('trend') == 'INSUFFICIENT_DATA':
+            return  # Fallback placeholders are not model output
+        probabilities = tuple(prediction.get(f'prob_{target}x', 0.0) for target in self.targets)
+        if room_name not in self.pending:
+            # Bound the backlog in case predictions arrive faster than rounds
+            self.pending[room_name] = deque(maxlen=self.horizon * 4)
+        pending = self.pending[room_name]
+        if len(pending) == pending.maxlen:
+            # The oldest prediction is about to fall out unscored; count it so the skew is visible
+            self.evicted[room_name] = self.evicted.get(room_name, 0) + 1
+        pending.append([probabilities, self.horizon, 0.0])
+
+    def observe_round(self, room_name, multiplier):
+        """Feed a finished round and resolve the predictions it completes"""
+        pending = self.pending.get(room_name)
+        if not pending:
+            return
+        for entry in pending:
+            entry[1] -= 1
+            entry[2] = max(entry[2], multiplier)
+        while pending and pending[0][1] <= 0:
+            probabilities, _, max_multiplier = pending.popleft()
+            self._resolve(room_name, probabilities, max_multiplier)
+
+    def _resolve(self, room_name, probabilities, max_multiplier):
+        room_stats = self.stats.setdefault(room_name, {})
+        for target, probability in zip(self.targets, probabilities):
+            if target not in room_stats:
+                room_stats[target] = TargetStats(self.bucket_count)
+            room_stats[target].update(probability, max_multiplier >= target)
+
+    def _rooms(self):
+        return list(dict.fromkeys(list(self.stats) + list(self.evicted)))
+
+    def summary(self, room_name=None, target=None):
+        """Hit rate, Brier score and calibration per room and target, plus evicted predictions"""
+        result = {}
+        for room in self._rooms():
+            if room_name is not None and room != room_name:
+                continue
+            result[room] = {'evicted': self.evicted.get(room, 0), 'targets': {}}
+            for t, stats in self.stats.get(room, {}).items():
+                if target is not None and t != target:
+                    continue
+                if not stats.count:
+                    continue
+                calibration = []
+                for index, (count, prob_sum, hits) in enumerate(stats.buckets):
+                    if count:
+                        calibration.append({
+                            'bucket': f"{index / self.bucket_count:.1f}-{(index + 1) / self.bucket_count:.1f}",
+                            'count': count,
+                            'predicted': round(prob_sum / count, 3),
+                            'observed': round(hits / count, 3)
+                        })
+                result[room]['targets'][t] = {
+                    'predictions': stats.count,
+                    'hit_rate': round(stats.hits / stats.count, 3),
+                    'mean_probability': round(stats.prob_sum / stats.count, 3),
+                    'brier': round(stats.brier_sum / stats.count, 4),
+                    'calibration': calibration
+                }
+        return result
+
+    def snapshot(self):
+        """Compact form: room -> {'evicted': n, 'targets': target -> [predictions, hits, brier]}"""
+        return {
+            room: {
+                'evicted': self.evicted.get(room, 0),
+                'targets': {
+                    str(t): [stats.count, stats.hits, round(stats.brier_sum / stats.count, 4)]
+                    for t, stats in self.stats.get(room, {}).items() if stats.count
+                }
+            }
+            for room in self._rooms()
+        }
+
+    def maybe_snapshot(self, now=None):
+        """Write the compact snapshot if the interval has elapsed"""
+        now = time.time() if now is None else now
+        if not self.snapshot_path or now - self.last_snapshot < self.snapshot_interval:
+            return None
+        self.last_snapshot = now
+        snapshot = {'timestamp': now, 'horizon': self.horizon, 'rooms': self.snapshot()}
+        try:
+            # Write then swap so external readers never see a half-written file
+            tmp_path = f"{self.snapshot_path}.tmp{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"Evaluation snapshot error: {e}")
+        return snapshot
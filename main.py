@@ -5,7 +5,10 @@ from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 from analyzer import AviatorAnalyzer
-import aiohttp
+from analysis_pool import AnalysisPool
+from digest import DigestCoalescer
+from evaluator import OnlineEvaluator
+from telegram_sender import OutboundScheduler, PRIORITY_URGENT, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
 import json
 import os
 
@@ -17,11 +20,21 @@ with open('config.json', 'r') as f:
     config = json.load(f)
 
 TELEGRAM_TOKEN = config['telegram_token']
+TELEGRAM_API_URL = config.get('telegram_api_url', 'https://api.telegram.org')  # Point at telegram_stub.py for load tests
 LEARNING_DURATION = config.get('learning_duration', 180)  # 3 minutes default
 
 class AviatorMonitorSystem:
     def __init__(self):
         self.analyzer = AviatorAnalyzer()
+        self.analysis_pool = AnalysisPool(self.analyzer)  # Keeps analysis and file writes off the event loop
+        self.digest = DigestCoalescer()  # One merged message per user per cycle
+        self.digest_window = config.get('digest_window', 5)
+        self.outbound = OutboundScheduler(TELEGRAM_TOKEN, api_url=TELEGRAM_API_URL)
+        self.evaluator = OnlineEvaluator(
+            self.analyzer.targets,
+            horizon=config.get('evaluation_horizon', 1),
+            snapshot_path='evaluation_snapshot.json'
+        )
         self.user_preferences = {}
         self.scraping = False
         self.learning_start_times = {}  # Track learning periods
@@ -177,17 +190,18 @@ class AviatorMonitorSystem:
             remaining = max(0, self.learning_duration - elapsed)
             
             if remaining > 0:
-                # Send progress update
+                # Queue progress update
                 try:
                     room_display = {
                         'room1': 'Room 1', 'room2': 'Room 2', 'room3': 'Room 3'
                     }.get(room_name, room_name)
                     
-                    await self.send_telegram_alert(
+                    self.digest.add(
                         user_id,
                         f"📚 *Learning Progress - {room_display}*\n"
                         f"Analyzing patterns... {minute} minute(s) completed.\n"
-                        f"Remaining: {int(remaining//60)}:{int(remaining%60):02d}"
+                        f"Remaining: {int(remaining//60)}:{int(remaining%60):02d}",
+                        PRIORITY_LOW
                     )
                 except:
                     pass
@@ -196,43 +210,62 @@ class AviatorMonitorSystem:
         if user_id in self.room_data[room_name]['learning_users']:
             self.room_data[room_name]['learning_users'].remove(user_id)
         
-        # Send completion message
+        # Queue completion message
         try:
-            await self.send_telegram_alert(
+            self.digest.add(
                 user_id,
                 f"✅ *Learning Complete - {room_name.upper()}*\n\n"
                 f"Analysis phase finished! Now sending real predictions for:\n"
-                f"1.5x, 2x, 3x, 4x, 5x, 10x, 20x, 30x, 40x, 50x, 60x, 70x, 80x, 90x, 100x, 1000x+"
+                f"1.5x, 2x, 3x, 4x, 5x, 10x, 20x, 30x, 40x, 50x, 60x, 70x, 80x, 90x, 100x, 1000x+",
+                PRIORITY_LOW
             )
         except:
             pass
     
     async def run_continuous_monitoring(self):
         """Main monitoring loop"""
+        # Learning messages arrive outside the cycle, so they get their own flush window
+        digest_task = asyncio.create_task(self.digest.run(self.send_telegram_alert, self.digest_window))
+        
         while self.scraping:
             try:
+                # Analyze every active room in parallel on the worker pool
+                active_rooms = [
+                    room_name for room_name in ['room1', 'room2', 'room3']
+                    if self.room_data[room_name]['active'] and self.room_data[room_name]['users']
+                ]
+                predictions = await self.analysis_pool.get_predictions(active_rooms)
+                
                 # Process each room
-                for room_name in ['room1', 'room2', 'room3']:
-                    if self.room_data[room_name]['active'] and self.room_data[room_name]['users']:
-                        # Get prediction for this room
-                        prediction = self.analyzer.get_prediction(room_name)
+                for room_name in active_rooms:
+                    prediction = predictions[room_name]
+                    
+                    # Score earlier predictions against the round just recorded
+                    if self.analyzer.room_histories[room_name]:
+                        latest_round = self.analyzer.room_histories[room_name][-1]
+                        self.evaluator.observe_round(room_name, latest_round['multiplier'])
+                    
+                    if prediction:
+                        self.evaluator.record_prediction(room_name, prediction)
                         
-                        if prediction:
-                            # Process each user in this room
-                            for user_id in list(self.room_data[room_name]['users']):
-                                # Skip if user is still in learning phase
-                                if user_id in self.room_data[room_name]['learning_users']:
-                                    continue
-                                
-                                # Generate alerts for this user
-                                alerts = self.get_alerts(prediction, room_name, user_id)
-                                
-                                # Send alerts
-                                for alert in alerts:
-                                    try:
-                                        await self.send_telegram_alert(user_id, alert)
-                                    except Exception as e:
-                                        logger.error(f"Send error to {user_id}: {e}")
+                        # Process each user in this room
+                        for user_id in list(self.room_data[room_name]['users']):
+                            # Skip if user is still in learning phase
+                            if user_id in self.room_data[room_name]['learning_users']:
+                                continue
+                            
+                            # Generate alerts for this user
+                            alerts = self.get_alerts(prediction, room_name, user_id)
+                            
+                            # Queue alerts for this cycle's digest
+                            for priority, alert in alerts:
+                                self.digest.add_to_cycle(user_id, alert, priority)
+                
+                self.evaluator.maybe_snapshot()
+                
+                # One message per user for everything produced this cycle
+                await self.digest.flush_cycle(self.send_telegram_alert)
+                logger.debug(f"Digest stats: {self.digest.get_stats()}")
                 
                 # Wait before next cycle
                 await asyncio.sleep(20)  # Check every 20 seconds
@@ -240,9 +273,11 @@ class AviatorMonitorSystem:
             except Exception as e:
                 logger.error(f"Monitoring error: {e}")
                 await asyncio.sleep(10)
+        
+        digest_task.cancel()
     
     def get_alerts(self, prediction, room_name, user_id):
-        """Generate alerts based on predictions"""
+        """Generate (priority, message) alerts based on predictions"""
         alerts = []
         
         room_display = {
@@ -281,17 +316,19 @@ class AviatorMonitorSystem:
         
         # Create alert messages
         if urgent_alerts:
-            alerts.append(
+            alerts.append((
+                PRIORITY_URGENT,
                 f"🚨 *URGENT 5x ALERT*\n"
                 f"{room_display}\n\n"
                 f"🎯 High Probability for 5x Multiplier!\n"
                 f"Confidence: {prediction['confidence']*100:.0f}%\n"
                 f"Trend: {prediction['trend']}\n\n"
                 f"🕐 {datetime.now().strftime('%H:%M:%S')}"
-            )
+            ))
         
         if high_alerts:
-            alerts.append(
+            alerts.append((
+                PRIORITY_HIGH,
                 f"🎯 *HIGH VALUE ALERT*\n"
                 f"{room_display}\n\n"
                 f"📈 Detected Potential for:\n"
@@ -299,34 +336,23 @@ class AviatorMonitorSystem:
                 f"⚡ Confidence: {prediction['confidence']*100:.0f}%\n"
                 f"📊 Trend: {prediction['trend']}\n\n"
                 f"🕐 {datetime.now().strftime('%H:%M:%S')}"
-            )
+            ))
         
         if medium_alerts and len(alerts) < 2:
-            alerts.append(
+            alerts.append((
+                PRIORITY_NORMAL,
                 f"📈 *SAFE PLAY ALERT*\n"
                 f"{room_display}\n\n"
                 f"🎯 Good chance for:\n"
                 f"   • {' | '.join(medium_alerts[:5])}\n\n"
                 f"🕐 {datetime.now().strftime('%H:%M:%S')}"
-            )
+            ))
         
         return alerts
     
-    async def send_telegram_alert(self, chat_id, message):
-        """Send message via Telegram API"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-                data = {
-                    'chat_id': chat_id,
-                    'text': message,
-                    'parse_mode': 'Markdown'
-                }
-                async with session.post(url, json=data) as response:
-                    return await response.json()
-        except Exception as e:
-            logger.error(f"Telegram API error: {e}")
-            return None
+    async def send_telegram_alert(self, chat_id, message, priority=PRIORITY_NORMAL):
+        """Queue a message for rate-limited delivery; the returned future resolves to the API response"""
+        return self.outbound.submit(chat_id, message, priority)
     
     async def send_status_update(self, user_id, query):
         """Send current status to user"""
@@ -352,6 +378,36 @@ class AviatorMonitorSystem:
             parse_mode='Markdown'
         )
     
+    async def accuracy_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show how emitted probabilities compare with actual rounds"""
+        summary = self.evaluator.summary()
+        lines = []
+        for room_name in ['room1', 'room2', 'room3']:
+            room_summary = summary.get(room_name)
+            if not room_summary:
+                continue
+            lines.append(f"*{room_name.upper()}*")
+            if room_summary['evicted']:
+                lines.append(f"• {room_summary['evicted']} predictions dropped before scoring")
+            for target in [1.5, 2, 5, 10, 20]:
+                stats = room_summary['targets'].get(target)
+                if stats:
+                    lines.append(
+                        f"• {target}x: predicted {stats['mean_probability']*100:.0f}% | "
+                        f"hit {stats['hit_rate']*100:.0f}% | Brier {stats['brier']:.3f} "
+                        f"({stats['predictions']} predictions)"
+                    )
+        
+        if not lines:
+            text = "No predictions have been scored yet."
+        else:
+            text = "\n".join(lines)
+        
+        await update.message.reply_text(
+            f"🎯 *Prediction Accuracy*\n\n{text}",
+            parse_mode='Markdown'
+        )
+    
     async def stop_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Stop monitoring for a user"""
         user_id = update.effective_user.id
@@ -378,17 +434,24 @@ class AviatorMonitorSystem:
             "Use /start to begin monitoring again.",
             parse_mode='Markdown'
         )
+    
+    async def shutdown(self, application):
+        """Release worker pools and the outbound session when the application stops"""
+        self.scraping = False
+        await self.outbound.close()
+        self.analysis_pool.shutdown()
 
 def main():
     """Main entry point"""
     system = AviatorMonitorSystem()
     
     # Create application
-    app = Application.builder().token(TELEGRAM_TOKEN).build()
+    app = Application.builder().token(TELEGRAM_TOKEN).post_shutdown(system.shutdown).build()
     
     # Add handlers
     app.add_handler(CommandHandler("start", system.start_command))
     app.add_handler(CommandHandler("stop", system.stop_command))
+    app.add_handler(CommandHandler("accuracy", system.accuracy_command))
     app.add_handler(CallbackQueryHandler(system.button_handler))
     
     print("🤖 Aviator Bot starting...")
@@ -0,0 +1,93 @@
+import time
+
+
+class RoomPollScheduler:
+    """Learn each room's round cadence and schedule polls around expected round ends"""
+
+    def __init__(self, rooms, default_interval=10.0, min_interval=1.0, max_interval=30.0,
+                 lead_time=1.5, smoothing=0.3):
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lead_time = lead_time  # Start polling this many seconds before the expected round end
+        self.smoothing = smoothing  # Weight of the newest round length in the cadence average
+        self.rooms = {}
+        for room_name in rooms:
+            self._state(room_name)
+
+    def _state(self, room_name):
+        if room_name not in self.rooms:
+            self.rooms[room_name] = {
+                'last_boundary': None,
+                'cadence': None,
+                'next_poll': 0.0,
+                'polls': 0,
+                'boundaries': 0,
+                'failures': 0  # Consecutive failed polls, drives the backoff
+            }
+        return self.rooms[room_name]
+
+    def is_due(self, room_name, now=None):
+        """Check whether a room should be polled now"""
+        now = time.time() if now is None else now
+        return now >= self.rooms[room_name]['next_poll']
+
+    def due_rooms(self, now=None):
+        """List the rooms that should be polled now"""
+        now = time.time() if now is None else now
+        return [room for room in self.rooms if self.is_due(room, now)]
+
+    def seconds_until_next_poll(self, now=None):
+        """Seconds to wait before any room is due"""
+        now = time.time() if now is None else now
+        next_poll = min(state['next_poll'] for state in self.rooms.values())
+        return max(0.0, next_poll - now)
+
+    def expected_round_end(self, room_name):
+        """Expected time of the next round boundary, or None while the cadence is unknown"""
+        state = self.rooms[room_name]
+        if state['last_boundary'] is None or state['cadence'] is None:
+            return None
+        return state['last_boundary'] + state['cadence']
+
+    def record_poll(self, room_name, round_changed, now=None):
+        """Update the cadence estimate after a poll and schedule the next one"""
+        now = time.time() if now is None else now
+        state = self._state(room_name)
+        state['polls'] += 1
+        state['failures'] = 0
+
+        if round_changed:
+            if state['last_boundary'] is not None:
+                observed = now - state['last_boundary']
+                if state['cadence'] is None:
+                    state['cadence'] = observed
+                else:
+                    state['cadence'] += self.smoothing * (observed - state['cadence'])
+            state['last_boundary'] = now
+            state['boundaries'] += 1
+
+        expected_end = self.expected_round_end(room_name)
+        if expected_end is None:
+            delay = self.default_interval
+        elif now >= expected_end - self.lead_time:
+            # Inside the window around the expected end: poll tightly until the round flips
+            delay = self.min_interval
+        else:
+            delay = expected_end - self.lead_time - now
+
+        state['next_poll'] = now + min(max(delay, self.min_interval), self.max_interval)
+        return state['next_poll']
+
+    def record_failure(self, room_name, now=None):
+        """Back off exponentially after a failed poll, capped at max_interval"""
+        now = time.time() if now is None else now
+        state = self._state(room_name)
+        state['failures'] += 1
+        delay = min(self.min_interval * 2 ** state['failures'], self.max_interval)
+        state['next_poll'] = now + delay
+        return state['next_poll']
+
+    def get_cadence(self, room_name):
+        """Learned round length in seconds, or None while still learning"""
+        return self.rooms[room_name]['cadence']
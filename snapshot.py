@@ -0,0 +1,203 @@
+"""Columnar binary snapshots of room histories
+
+Layout (little-endian):
+
+    header   40 bytes  magic b'AVSNAP\\0\\0', version u32, reserved u32,
+                       count u64, room name (16 bytes, NUL padded)
+    column   float64[count]  multiplier
+    column   float64[count]  timestamp (Unix seconds)
+    column   int64[count]    round_id
+
+Snapshots are written to a temporary file and swapped in with os.replace,
+so readers that already mapped the old file keep a consistent view while
+the bot writes a new one.
+"""
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+MAGIC = b'AVSNAP\x00\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ16s')
+
+
+def _to_epoch(timestamp):
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp).timestamp()
+    return float(timestamp or 0.0)
+
+
+def write_snapshot(path, room_name, records):
+    """Write history records (dicts with multiplier, timestamp, round_id) as a snapshot"""
+    multipliers = array.array('d', (float(r['multiplier']) for r in records))
+    timestamps = array.array('d', (_to_epoch(r.get('timestamp')) for r in records))
+    round_ids = array.array('q', (int(r.get('round_id', 0)) for r in records))
+    if sys.byteorder != 'little':
+        for column in (multipliers, timestamps, round_ids):
+            column.byteswap()
+
+    tmp_path = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(multipliers), room_name.encode()[:16]))
+        multipliers.tofile(f)
+        timestamps.tofile(f)
+        round_ids.tofile(f)
+    os.replace(tmp_path, path)
+    return len(multipliers)
+
+
+class SnapshotReader:
+    """Memory-mapped view of a snapshot; column attributes are zero-copy memoryviews"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._mmap = None
+        self._file = open(path, 'rb')
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{self.path} is too short to be a room history snapshot")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, room = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} room history snapshot")
+        if sys.byteorder != 'little':
+            raise ValueError("Zero-copy snapshot reads require a little-endian host")
+        if len(self._mmap) < HEADER.size + 24 * count:
+            raise ValueError(f"{self.path} is truncated: header says {count} rounds")
+
+        self.count = count
+        self.room_name = room.rstrip(b'\x00').decode()
+        view = memoryview(self._mmap)
+        self._view = view
+        offset = HEADER.size
+        width = 8 * count
+        self.multipliers = view[offset:offset + width].cast('d')
+        self.timestamps = view[offset + width:offset + 2 * width].cast('d')
+        self.round_ids = view[offset + 2 * width:offset + 3 * width].cast('q')
+
+    def __len__(self):
+        return self.count
+
+    def records(self, start=0):
+        """Materialise rounds as history dicts, from start (negative counts from the end)"""
+        if start < 0:
+            start = max(0, self.count + start)
+        # Convert each column in one call; per-item memoryview indexing is slower
+        columns = zip(self.multipliers[start:].tolist(), self.timestamps[start:].tolist(),
+                      self.round_ids[start:].tolist())
+        for multiplier, timestamp, round_id in columns:
+            yield {
+                'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
+                'multiplier': multiplier,
+                'room': self.room_name,
+                'round_id': round_id
+            }
+
+    def close(self):
+        for name in ('multipliers', 'timestamps', 'round_ids', '_view'):
+            column = getattr(self, name, None)
+            if column is not None:
+                column.release()
+                setattr(self, name, None)
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_json(json_path, snapshot_path=None, room_name=None, force=False):
+    """Convert an existing roomN_data.json history into a snapshot
+
+    An existing snapshot is the bot's live history, so it is only replaced
+    when force is set.
+    """
+    if snapshot_path is None:
+        snapshot_path = os.path.splitext(json_path)[0] + '.avs'
+    if not force and os.path.exists(snapshot_path):
+        raise FileExistsError(f"{snapshot_path} already exists (use --force to overwrite)")
+    if room_name is None:
+        room_name = os.path.basename(json_path).split('_')[0]
+    with open(json_path, 'r') as f:
+        records = json.load(f)
+    count = write_snapshot(snapshot_path, room_name, records)
+    return snapshot_path, count
+
+
+def benchmark_load(json_path, snapshot_path, repeats=20):
+    """Compare JSON loading with mmap snapshot loading (milliseconds per load)
+
+    snapshot_records_ms is the path the analyzer takes at startup, since it
+    still works on history dicts; snapshot_columns_ms only reads the columns.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with open(json_path, 'r') as f:
+            json.load(f)
+    json_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with SnapshotReader(snapshot_path) as reader:
+            sum(reader.multipliers)
+    column_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with SnapshotReader(snapshot_path) as reader:
+            list(reader.records())
+    records_time = (time.perf_counter() - start) / repeats
+
+    return {
+        'json_ms': round(json_time * 1000, 3),
+        'snapshot_columns_ms': round(column_time * 1000, 3),
+        'snapshot_records_ms': round(records_time * 1000, 3)
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Room history snapshot tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert_parser = subparsers.add_parser('convert', help="Convert roomN_data.json files to snapshots")
+    convert_parser.add_argument('json_files', nargs='+')
+    convert_parser.add_argument('--force', action='store_true', help="Overwrite existing snapshots")
+    bench_parser = subparsers.add_parser('bench', help="Compare JSON and snapshot load times")
+    bench_parser.add_argument('json_file')
+    bench_parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        for json_file in args.json_files:
+            try:
+                path, count = convert_json(json_file, force=args.force)
+                print(f"Wrote {count} rounds to {path}")
+            except FileExistsError as e:
+                print(f"Skipped {json_file}: {e}")
+    else:
+        # Benchmark against a scratch copy so the bot's live snapshot is left alone
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path, count = convert_json(args.json_file, os.path.join(tmp_dir, 'bench.avs'))
+            print(f"{count} rounds: {benchmark_load(args.json_file, path, args.repeats)}")
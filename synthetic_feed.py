@@ -0,0 +1,249 @@
+import array
+import asyncio
+import hashlib
+import inspect
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; batch generation falls back to pure Python
+    np = None
+
+# Room-specific behavior
+ROOM_PROFILES = {
+    'room1': {'distribution': 'profile', 'min': 1.0, 'max': 10.0, 'volatility': 0.5, 'high_chance': 0.05},
+    'room2': {'distribution': 'profile', 'min': 1.0, 'max': 25.0, 'volatility': 1.0, 'high_chance': 0.05},
+    'room3': {'distribution': 'profile', 'min': 1.0, 'max': 100.0, 'volatility': 2.0, 'high_chance': 0.05}
+}
+
+DEFAULT_PROFILE = {'distribution': 'profile', 'min': 1.0, 'max': 5.0, 'volatility': 0.5, 'high_chance': 0.05}
+
+DISTRIBUTIONS = ('profile', 'crash')
+
+
+def derive_seed(seed, room_name):
+    """Stable per-room seed so each room gets an independent stream"""
+    if seed is None:
+        return None
+    digest = hashlib.sha256(f"{seed}:{room_name}".encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class RoomRoundGenerator:
+    """Seedable multiplier generator for a single room
+
+    The 'profile' distribution reproduces the original simulated rooms. The
+    'crash' distribution draws (1 - house_edge) / U, the usual crash-game
+    curve, capped at the profile max.
+    """
+
+    def __init__(self, room_name, seed=None, profile=None):
+        self.room_name = room_name
+        self.seed = seed
+        # Layer overrides: defaults, then the room's own profile, then the caller's
+        self.profile = dict(DEFAULT_PROFILE)
+        self.profile.update(ROOM_PROFILES.get(room_name, {}))
+        self.profile.update(profile or {})
+        if self.profile['distribution'] not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {self.profile['distribution']}")
+        self.rng = random.Random(seed)
+        # Batches get their own stream, created once so successive batches continue it
+        batch_seed = derive_seed(seed, 'batch')
+        self.batch_rng = random.Random(batch_seed) if np is None else np.random.default_rng(batch_seed)
+        self.round_id = 0
+
+    def next_multiplier(self):
+        """Draw one multiplier"""
+        return self._draw(self.rng)
+
+    def _draw(self, rng):
+        profile = self.profile
+        if profile['distribution'] == 'crash':
+            edge = profile.get('house_edge', 0.03)
+            multiplier = (1 - edge) / (1.0 - rng.random())
+            multiplier = min(max(multiplier, profile['min']), profile['max'])
+        else:
+            # Generate multiplier with some randomness
+            base = rng.uniform(profile['min'], profile['max'] / 2)
+            volatility = rng.uniform(0, profile['volatility'])
+            multiplier = base * (1 + volatility)
+
+            # Occasionally generate very high multipliers
+            if rng.random() < profile['high_chance']:
+                multiplier = rng.uniform(profile['max'] * 0.7, profile['max'] * 1.3)
+
+        return round(multiplier, 2)
+
+    def next_round(self):
+        """Draw one round in the same shape as the analyzer history records"""
+        self.round_id += 1
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'multiplier': self.next_multiplier(),
+            'room': self.room_name,
+            'round_id': self.round_id
+        }
+
+    def generate_multipliers(self, count):
+        """Draw a batch of multipliers
+
+        Returns a numpy float64 array when numpy is installed, otherwise an
+        array('d'). Batches come from a separate stream seeded from the same
+        seed: each call continues that stream, but not next_round().
+        """
+        profile = self.profile
+        if np is None:
+            return array.array('d', (self._draw(self.batch_rng) for _ in range(count)))
+
+        rng = self.batch_rng
+        if profile['distribution'] == 'crash':
+            edge = profile.get('house_edge', 0.03)
+            multipliers = (1 - edge) / (1.0 - rng.random(count))
+            multipliers = np.clip(multipliers, profile['min'], profile['max'])
+        else:
+            base = rng.uniform(profile['min'], profile['max'] / 2, count)
+            volatility = rng.uniform(0, profile['volatility'], count)
+            multipliers = base * (1 + volatility)
+            high = rng.random(count) < profile['high_chance']
+            multipliers[high] = rng.uniform(profile['max'] * 0.7, profile['max'] * 1.3, int(high.sum()))
+
+        return np.round(multipliers, 2)
+
+    def write_multipliers(self, path, count, chunk_size=1_000_000):
+        """Write count multipliers to path as raw little-endian float64"""
+        written = 0
+        chunk_index = 0
+        with open(path, 'wb') as f:
+            while written < count:
+                size = min(chunk_size, count - written)
+                chunk_gen = RoomRoundGenerator(
+                    self.room_name, derive_seed(self.seed, f"chunk{chunk_index}"), self.profile
+                )
+                chunk = chunk_gen.generate_multipliers(size)
+                if np is None:
+                    chunk.tofile(f)
+                else:
+                    chunk.astype('<f8').tofile(f)
+                written += size
+                chunk_index += 1
+        return written
+
+
+class SyntheticFeed:
+    """Per-room round generators sharing one base seed"""
+
+    def __init__(self, seed=None, profiles=None):
+        self.seed = seed
+        self.profiles = profiles or {}
+        self.generators = {}
+
+    def generator(self, room_name):
+        if room_name not in self.generators:
+            self.generators[room_name] = RoomRoundGenerator(
+                room_name, derive_seed(self.seed, room_name), self.profiles.get(room_name)
+            )
+        return self.generators[room_name]
+
+    def next_round(self, room_name):
+        return self.generator(room_name).next_round()
+
+    def generate_batch(self, count, rooms=('room1', 'room2', 'room3')):
+        """Draw count multipliers for each room"""
+        return {room: self.generator(room).generate_multipliers(count) for room in rooms}
+
+
+class SoakDriver:
+    """Drive the analyzer and alert path from a synthetic feed at a fixed rate"""
+
+    def __init__(self, analyzer, feed, rooms=('room1', 'room2', 'room3'), on_prediction=None):
+        self.analyzer = analyzer
+        self.feed = feed
+        self.rooms = list(rooms)
+        self.on_prediction = on_prediction  # e.g. lambda prediction, room: system.get_alerts(prediction, room, user_id)
+        self.analyzer.feed = feed
+        self.stats = {'rounds': 0, 'predictions': 0, 'alerts': 0}
+        self.target_rate = None
+
+    async def _process_round(self, room_name):
+        self.analyzer.record_round(room_name)
+        prediction = self.analyzer.analyze_patterns(room_name)
+        self.stats['rounds'] += 1
+        self.stats['predictions'] += 1
+        if self.on_prediction:
+            result = self.on_prediction(prediction, room_name)
+            if inspect.isawaitable(result):
+                result = await result
+            if result:
+                self.stats['alerts'] += len(result)
+
+    async def run(self, duration, rounds_per_sec=100, report_every=10.0, report=print, yield_every=100):
+        """Feed rounds for duration seconds, reporting throughput and memory"""
+        self.target_rate = rounds_per_sec
+        tracemalloc.start()
+        start = time.perf_counter()
+        next_report = start + report_every
+        room_index = 0
+        try:
+            while True:
+                now = time.perf_counter()
+                elapsed = now - start
+                if elapsed >= duration:
+                    break
+
+                due = int(elapsed * rounds_per_sec) - self.stats['rounds']
+                for i in range(due):
+                    await self._process_round(self.rooms[room_index])
+                    room_index = (room_index + 1) % len(self.rooms)
+                    if (i + 1) % yield_every == 0:
+                        # Let the alert path and other tasks run while catching up
+                        await asyncio.sleep(0)
+                        next_report = self._maybe_report(start, next_report, report_every, report)
+                        if time.perf_counter() - start >= duration:
+                            break
+
+                next_report = self._maybe_report(start, next_report, report_every, report)
+
+                await asyncio.sleep(min(0.01, 1.0 / rounds_per_sec))
+
+            return self.summary(time.perf_counter() - start)
+        finally:
+            tracemalloc.stop()
+
+    def _maybe_report(self, start, next_report, report_every, report):
+        """Report with a fresh clock reading so the rate reflects any backlog"""
+        now = time.perf_counter()
+        if now >= next_report:
+            report(self.summary(now - start))
+            next_report += report_every
+        return next_report
+
+    def summary(self, elapsed):
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            'elapsed': round(elapsed, 1),
+            'rounds': self.stats['rounds'],
+            'target_rounds_per_sec': self.target_rate,
+            'rounds_per_sec': round(self.stats['rounds'] / elapsed, 1) if elapsed else 0.0,
+            'alerts': self.stats['alerts'],
+            'memory_kb': current // 1024,
+            'peak_memory_kb': peak // 1024,
+            'history_sizes': {room: len(self.analyzer.room_histories.get(room, [])) for room in self.rooms}
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic multipliers for soak tests")
+    parser.add_argument('room')
+    parser.add_argument('count', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = SyntheticFeed(seed=args.seed).generator(args.room).write_multipliers(args.output, args.count)
+    print(f"Wrote {written} rounds for {args.room} to {args.output} in {time.perf_counter() - start:.2f}s")
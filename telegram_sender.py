@@ -0,0 +1,249 @@
+import asyncio
+import itertools
+import logging
+import time
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Lower value = sent first
+PRIORITY_URGENT = 0    # 5x alerts
+PRIORITY_HIGH = 1      # High value alerts
+PRIORITY_NORMAL = 2    # Safe play alerts
+PRIORITY_LOW = 3       # Learning progress and completion
+
+# Seconds after which a queued message is dropped instead of delivered stale
+DEFAULT_MAX_AGE = {
+    PRIORITY_URGENT: 20,
+    PRIORITY_HIGH: 30,
+    PRIORITY_NORMAL: 30,
+    PRIORITY_LOW: 120
+}
+
+
+class TokenBucket:
+    """Classic token bucket: rate tokens per second, up to capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        # A bucket created after the caller read the clock must not start in debt
+        if now <= self.updated:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until one token is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def drain(self, now):
+        """Empty the bucket so sending resumes at the refill rate"""
+        self._refill(now)
+        self.tokens = 0
+
+    def is_idle(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class OutboundMessage:
+    def __init__(self, chat_id, text, priority, deadline, seq, future):
+        self.chat_id = chat_id
+        self.text = text
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+        self.future = future
+
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+
+class OutboundScheduler:
+    """Priority queue in front of sendMessage that respects Telegram's rate limits
+
+    A global bucket models the per-bot limit and one bucket per chat models the
+    per-chat limit. Telegram's 429 does not say which limit was hit, so a 429
+    pauses every send for the returned retry_after as well as the chat, and the
+    message is re-queued unless its deadline has passed.
+    """
+
+    def __init__(self, token, api_url='https://api.telegram.org', global_rate=30, global_burst=30,
+                 chat_rate=1, chat_burst=3, max_in_flight=10, max_age=None):
+        self.url = f"{api_url}/bot{token}/sendMessage"
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets = {}
+        self.chat_blocked_until = {}
+        self.paused_until = 0.0  # Bot-wide pause after a 429
+        self.max_age = dict(DEFAULT_MAX_AGE)
+        self.max_age.update(max_age or {})
+        self.queue = []
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'throttled': 0, 'dropped_stale': 0}
+        self._seq = itertools.count()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._deliveries = set()  # Strong references so running deliveries are not garbage-collected
+        self.session = None
+
+    def submit(self, chat_id, text, priority=PRIORITY_NORMAL, max_age=None):
+        """Queue a message; the returned future resolves to the API response or None if dropped"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+        now = time.monotonic()
+        age = max_age if max_age is not None else self.max_age.get(priority, DEFAULT_MAX_AGE[PRIORITY_NORMAL])
+        future = asyncio.get_running_loop().create_future()
+        self.queue.append(OutboundMessage(chat_id, text, priority, now + age, next(self._seq), future))
+        self.stats['queued'] += 1
+        self._wakeup.set()
+        return future
+
+    def _chat_bucket(self, chat_id):
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return self.chat_buckets[chat_id]
+
+    def _drop(self, message):
+        self.stats['dropped_stale'] += 1
+        if not message.future.done():
+            message.future.set_result(None)
+
+    def _next_ready(self, now):
+        """Pop the best sendable message, or return how long to wait for one"""
+        if now < self.paused_until:
+            return None, self.paused_until - now
+        global_wait = self.global_bucket.wait_time(now)
+        if global_wait > 0:
+            return None, global_wait
+
+        wait = None
+        self.queue.sort(key=OutboundMessage.sort_key)
+        for message in list(self.queue):
+            if now > message.deadline:
+                self.queue.remove(message)
+                self._drop(message)
+                continue
+
+            blocked = self.chat_blocked_until.get(message.chat_id, 0) - now
+            chat_wait = max(blocked, self._chat_bucket(message.chat_id).wait_time(now))
+            if chat_wait <= 0:
+                self.queue.remove(message)
+                self.global_bucket.consume(now)
+                self._chat_bucket(message.chat_id).consume(now)
+                return message, 0.0
+
+            wait = chat_wait if wait is None else min(wait, chat_wait)
+
+        return None, wait
+
+    def _prune(self, now):
+        """Forget per-chat state for chats that have gone quiet"""
+        for chat_id in [c for c, b in self.chat_buckets.items() if b.is_idle(now)]:
+            del self.chat_buckets[chat_id]
+        for chat_id in [c for c, until in self.chat_blocked_until.items() if until <= now]:
+            del self.chat_blocked_until[chat_id]
+
+    async def _run(self):
+        self.session = aiohttp.ClientSession()
+        while True:
+            # Take a delivery slot before choosing, so a 429 from the request
+            # in flight still applies to the next message picked
+            await self._in_flight.acquire()
+            now = time.monotonic()
+            message, wait = self._next_ready(now)
+            if message is None:
+                self._in_flight.release()
+                if not self.queue:
+                    self._prune(now)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            delivery = asyncio.create_task(self._deliver(message))
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, message):
+        try:
+            data = {
+                'chat_id': message.chat_id,
+                'text': message.text,
+                'parse_mode': 'Markdown'
+            }
+            async with self.session.post(self.url, json=data) as response:
+                result = await response.json(content_type=None)
+                status = response.status
+
+            if status == 429:
+                retry_after = result.get('parameters', {}).get('retry_after', 1)
+                now = time.monotonic()
+                self.stats['throttled'] += 1
+                self.chat_blocked_until[message.chat_id] = now + retry_after
+                # Could be the bot-wide flood limit: hold everything and start the global bucket empty
+                self.paused_until = max(self.paused_until, now + retry_after)
+                self.global_bucket.drain(now)
+                if now > message.deadline:
+                    self._drop(message)
+                else:
+                    self.queue.append(message)
+                    self._wakeup.set()
+                return
+
+            if result.get('ok'):
+                self.stats['sent'] += 1
+            else:
+                self.stats['failed'] += 1
+                logger.error(f"Telegram API error for {message.chat_id}: {result.get('description')}")
+            if not message.future.done():
+                message.future.set_result(result)
+
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"Telegram API error: {e}")
+            if not message.future.done():
+                message.future.set_result(None)
+        finally:
+            self._in_flight.release()
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['pending'] = len(self.queue)
+        return stats
+
+    async def close(self):
+        """Stop scheduling, wait for in-flight deliveries, then close the session"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+        # Nothing will send what is still queued, so release anyone awaiting it
+        for message in self.queue:
+            if not message.future.done():
+                message.future.set_result(None)
+        self.queue = []
+        if self.session:
+            await self.session.close()
+            self.session = None
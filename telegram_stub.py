@@ -0,0 +1,65 @@
+import argparse
+import time
+from aiohttp import web
+from telegram_sender import TokenBucket
+
+
+class TelegramStub:
+    """Local stand-in for the Bot API sendMessage endpoint that enforces rate limits
+
+    Point OutboundScheduler at it with api_url='http://127.0.0.1:<port>'.
+    """
+
+    def __init__(self, global_rate=30, global_burst=30, chat_rate=1, chat_burst=3, retry_after=1):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets = {}
+        self.retry_after = retry_after
+        self.received = []
+        self.rejected = 0
+        self.rejected_at = []  # (time, chat_id) of every 429
+
+    async def send_message(self, request):
+        data = await request.json()
+        now = time.monotonic()
+        chat_id = data.get('chat_id')
+        chat_bucket = self.chat_buckets.setdefault(chat_id, TokenBucket(self.chat_rate, self.chat_burst))
+
+        if self.global_bucket.wait_time(now) > 0 or chat_bucket.wait_time(now) > 0:
+            self.rejected += 1
+            self.rejected_at.append((now, chat_id))
+            return web.json_response({
+                'ok': False,
+                'error_code': 429,
+                'description': f"Too Many Requests: retry after {self.retry_after}",
+                'parameters': {'retry_after': self.retry_after}
+            }, status=429)
+
+        self.global_bucket.consume(now)
+        chat_bucket.consume(now)
+        self.received.append((now, chat_id, data.get('text', '')))
+        return web.json_response({
+            'ok': True,
+            'result': {'message_id': len(self.received), 'chat': {'id': chat_id}, 'text': data.get('text', '')}
+        })
+
+    async def stats(self, request):
+        return web.json_response({'received': len(self.received), 'rejected': self.rejected})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/sendMessage', self.send_message)
+        app.router.add_get('/stats', self.stats)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate-limited Telegram Bot API stub")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--global-rate', type=float, default=30)
+    parser.add_argument('--chat-rate', type=float, default=1)
+    args = parser.parse_args()
+
+    stub = TelegramStub(global_rate=args.global_rate, chat_rate=args.chat_rate)
+    web.run_app(stub.make_app(), host='127.0.0.1', port=args.port)
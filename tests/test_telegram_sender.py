@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from aiohttp import web
+from telegram_sender import OutboundScheduler, PRIORITY_LOW, PRIORITY_URGENT
+from telegram_stub import TelegramStub
+
+# The stub measures limits on arrival, the scheduler on dispatch, so unless a
+# test wants 429s the stub is configured looser than the scheduler.
+LOOSE_LIMITS = dict(global_rate=100, global_burst=100, chat_rate=100, chat_burst=100)
+
+
+class OutboundSchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def start_stub(self, **limits):
+        stub = TelegramStub(**limits)
+        runner = web.AppRunner(stub.make_app())
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        self.addAsyncCleanup(runner.cleanup)
+        port = runner.addresses[0][1]
+        return stub, f"http://127.0.0.1:{port}"
+
+    def make_scheduler(self, url, **kwargs):
+        scheduler = OutboundScheduler('TOKEN', api_url=url, **kwargs)
+        self.addAsyncCleanup(scheduler.close)
+        return scheduler
+
+    async def test_urgent_message_jumps_the_queue(self):
+        stub, url = await self.start_stub(**LOOSE_LIMITS)
+        scheduler = self.make_scheduler(url, global_rate=20, global_burst=1, max_in_flight=1)
+
+        futures = [scheduler.submit(chat, f"low {chat}", PRIORITY_LOW) for chat in range(5)]
+        futures.append(scheduler.submit(99, "urgent", PRIORITY_URGENT))
+        await asyncio.gather(*futures)
+
+        texts = [text for _, _, text in stub.received]
+        self.assertEqual(texts[0], "urgent")
+        self.assertEqual(texts[1:], [f"low {chat}" for chat in range(5)])
+        self.assertEqual(stub.rejected, 0)
+
+    async def test_429_pauses_every_chat_for_retry_after(self):
+        # The stub allows one message per chat per second; the scheduler thinks three
+        stub, url = await self.start_stub(global_rate=100, global_burst=100, chat_rate=1, chat_burst=1,
+                                          retry_after=1)
+        scheduler = self.make_scheduler(url, chat_rate=10, chat_burst=3, max_in_flight=1)
+
+        futures = [
+            scheduler.submit(1, "first", PRIORITY_LOW),
+            scheduler.submit(1, "second", PRIORITY_LOW),
+            scheduler.submit(2, "other chat", PRIORITY_LOW)
+        ]
+        results = await asyncio.gather(*futures)
+
+        self.assertTrue(all(result and result['ok'] for result in results))
+        self.assertEqual(stub.rejected, 1)
+        self.assertEqual(scheduler.get_stats()['throttled'], 1)
+        rejected_at, _ = stub.rejected_at[0]
+        later = [(at, text) for at, _, text in stub.received if at > rejected_at]
+        self.assertEqual(sorted(text for _, text in later), ["other chat", "second"])
+        for at, text in later:
+            self.assertGreaterEqual(at - rejected_at, 0.95, f"{text!r} sent before retry_after")
+
+    async def test_stale_messages_are_dropped(self):
+        stub, url = await self.start_stub(**LOOSE_LIMITS)
+        scheduler = self.make_scheduler(url, global_rate=5, global_burst=1, max_in_flight=1)
+
+        futures = [scheduler.submit(chat, f"low {chat}", PRIORITY_LOW, max_age=0.5) for chat in range(10)]
+        results = await asyncio.gather(*futures)
+
+        stats = scheduler.get_stats()
+        dropped = [result for result in results if result is None]
+        self.assertGreater(stats['dropped_stale'], 0)
+        self.assertEqual(len(dropped), stats['dropped_stale'])
+        self.assertEqual(stats['sent'] + stats['dropped_stale'], 10)
+        self.assertEqual(len(stub.received), stats['sent'])
+        self.assertEqual(stub.rejected, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()